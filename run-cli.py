@@ -1,17 +1,20 @@
 import os
 import queue
+import sys
 import threading
 import time
 import logging
-import keyboard
 import click
+import pyperclip
 from typing import Any, Optional
 from audioplayer import AudioPlayer
-from pynput.keyboard import Controller
+from pynput.keyboard import Controller, Key
 
 from src.configurations.recording_mode import RecordingMode
 from src.writer.transcription_module import TranscriptionService
 from src.writer.status_window_module import StatusWindow
+from src.writer.hotkey_module import ActivationKeyListener
+from src.writer.logger_module import LOGGER
 from src.configurations.configuration import Configuration, APIOptions, LocalModelOptions
 
 os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
@@ -22,14 +25,16 @@ class WhisperWriterCli:
     def __init__(self, config: Configuration) -> None:
         self.config: Configuration = config
         self.status_queue: queue.Queue = queue.Queue()
-        self.local_model: Optional[Any] = None
         self.pyinput_keyboard: Controller = Controller()
-        self.logger: logging.Logger = self.setup_logger()
+        self.shortcut_lock: threading.Lock = threading.Lock()
+        self.completion_sound: Optional[AudioPlayer] = (
+            AudioPlayer(os.path.join('assets', 'beep.wav')) if self.config.noise_on_completion else None)
+        self.logger: logging.Logger = LOGGER
         self.transcription_service: TranscriptionService = TranscriptionService(self.config)
 
         if not self.config.use_api:
             self.logger.info('Creating local model...')
-            self.local_model = self.transcription_service.create_local_model()
+            self.transcription_service.local_model = self.transcription_service.create_local_model()
             self.logger.info('Local model created.')
 
         self.setup()
@@ -53,15 +58,29 @@ class WhisperWriterCli:
             except queue.Empty:
                 break
 
+    def trigger_shortcut(self) -> None:
+        # Hotkey callbacks must not block the pynput listener thread (it also tracks the key state that ends a
+        # recording), so each recording runs on its own thread. Presses while one is in progress (e.g. the press that
+        # ends a press_to_toggle recording) are dropped.
+        if not self.shortcut_lock.acquire(blocking=False):
+            return
+        threading.Thread(target=self.run_shortcut, daemon=True).start()
+
+    def run_shortcut(self) -> None:
+        try:
+            self.on_shortcut()
+        except Exception as e:
+            self.logger.error(f'Error while handling the activation key combo: {e}')
+        finally:
+            self.shortcut_lock.release()
+
     def on_shortcut(self) -> None:
         self.clear_status_queue()
 
         self.status_queue.put(('recording', 'Recording...'))
         recording_thread: WhisperWriterCli.ResultThread = self.ResultThread(
             target=self.transcription_service.record_and_transcribe,
-            args=(self.status_queue,),
-            kwargs={'config': self.config,
-                    'local_model': self.local_model if self.local_model and not self.config.use_api else None}
+            args=(self.status_queue,)
         )
 
         if not self.config.hide_status_window:
@@ -81,17 +100,34 @@ class WhisperWriterCli:
         if transcribed_text:
             self.typewrite(transcribed_text, interval=self.config.writing_key_press_delay)
 
-        if self.config.noise_on_completion:
-            AudioPlayer(os.path.join('assets', 'beep.wav')).play(block=True)
+        if self.completion_sound:
+            threading.Thread(target=self.completion_sound.play, kwargs={'block': True}, daemon=True).start()
 
     def format_keystrokes(self, key_string: str) -> str:
         return '+'.join(word.capitalize() for word in key_string.split('+'))
 
     def typewrite(self, text: str, interval: float) -> None:
+        if interval <= 0:
+            self.paste(text)
+            return
+
+        deadline: float = time.perf_counter()
         for letter in text:
             self.pyinput_keyboard.press(letter)
             self.pyinput_keyboard.release(letter)
-            time.sleep(interval)
+            deadline += interval
+            remaining: float = deadline - time.perf_counter()
+            if remaining > 0:
+                time.sleep(remaining)
+            else:
+                # Fell behind (e.g. the target app stalled): restart the schedule instead of bursting to catch up.
+                deadline = time.perf_counter()
+
+    def paste(self, text: str) -> None:
+        pyperclip.copy(text)
+        paste_modifier: Key = Key.cmd if sys.platform == 'darwin' else Key.ctrl
+        with self.pyinput_keyboard.pressed(paste_modifier):
+            self.pyinput_keyboard.tap('v')
 
     def setup(self) -> None:
         model_method: str = 'OpenAI\'s API' if self.config.use_api else 'a local model'
@@ -111,26 +147,20 @@ class WhisperWriterCli:
             self.logger.info(' When it is pressed, recording will start, and will stop when you release the key combo.')
 
         try:
-            keyboard.add_hotkey(self.config.activation_key, self.on_shortcut)
+            hotkey_listener: ActivationKeyListener = ActivationKeyListener(self.config.activation_key, self.trigger_shortcut)
+            self.transcription_service.activation_key_listener = hotkey_listener
+            hotkey_listener.start()
             self.logger.info(f'Hotkey {self.config.activation_key} added successfully.')
         except Exception as e:
             self.logger.error(f'Failed to add hotkey {self.config.activation_key}: {e}')
+            return
 
         try:
-            keyboard.wait()  # Keep the script running to listen for the shortcut
+            hotkey_listener.join()  # Keep the script running to listen for the shortcut
         except KeyboardInterrupt:
             self.logger.info('\nExiting the script...')
             os.system('exit')
 
-    def setup_logger(self) -> logging.Logger:
-        logger: logging.Logger = logging.getLogger(__name__)
-        logger.setLevel(logging.INFO)
-        handler: logging.StreamHandler = logging.StreamHandler()
-        formatter: logging.Formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        return logger
-
 
 @click.command()
 @click.option('--use-api', is_flag=True, default=False, help='Use API instead of local model')
@@ -146,14 +176,17 @@ class WhisperWriterCli:
 @click.option('--local-initial-prompt', default=None, help='Local model initial prompt')
 @click.option('--local-condition-on-previous-text/--no-local-condition-on-previous-text', default=True,
               help='Local model condition on previous text')
-@click.option('--local-vad-filter/--no-local-vad-filter', default=False, help='Local model VAD filter')
+@click.option('--local-vad-filter/--no-local-vad-filter', default=False,
+              help='Local model VAD filter; ignored in voice_activity_detection mode and always on when batching')
+@click.option('--local-batch-size', default=1, type=int,
+              help='Local model batch size; values above 1 use batched inference')
 @click.option('--activation-key', default='ctrl+shift+space', help='Activation key combination')
 @click.option('--recording-mode', type=click.Choice([mode.value for mode in RecordingMode]),
               default='voice_activity_detection', help='Recording mode')
 @click.option('--sound-device', default=None, help='Sound device to use')
 @click.option('--sample-rate', default=16000, type=int, help='Sample rate for recording')
 @click.option('--silence-duration', default=900, type=int, help='Duration of silence before stopping recording')
-@click.option('--writing-key-press-delay', default=0.008, type=float, help='Delay between key presses during typing')
+@click.option('--writing-key-press-delay', default=0.008, type=float, help='Delay between key presses during typing, or 0 to paste')
 @click.option('--noise-on-completion/--no-noise-on-completion', default=False, help='Play noise on completion')
 @click.option('--remove-trailing-period/--no-remove-trailing-period', default=True,
               help='Remove trailing period from transcribed text')
@@ -167,6 +200,7 @@ class WhisperWriterCli:
 def main(use_api, api_model, api_language, api_temperature, api_initial_prompt, local_model, local_device,
          local_compute_type,
          local_language, local_temperature, local_initial_prompt, local_condition_on_previous_text, local_vad_filter,
+         local_batch_size,
          activation_key, recording_mode, sound_device, sample_rate, silence_duration, writing_key_press_delay,
          noise_on_completion, remove_trailing_period, add_trailing_space, remove_capitalization, print_to_terminal,
          hide_status_window):
@@ -178,7 +212,7 @@ def main(use_api, api_model, api_language, api_temperature, api_initial_prompt,
                                               language=local_language,
                                               temperature=local_temperature, initial_prompt=local_initial_prompt,
                                               condition_on_previous_text=local_condition_on_previous_text,
-                                              vad_filter=local_vad_filter),
+                                              vad_filter=local_vad_filter, batch_size=local_batch_size),
         activation_key=activation_key,
         recording_mode=RecordingMode(recording_mode),
         sound_device=sound_device,
@@ -1,10 +1,14 @@
-import sys
+import os
 import subprocess
 import sys
-import os
 
 os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
 os.environ['PYTHONUNBUFFERED'] = '1'
 
-print('Starting WhisperWriter...')
-subprocess.run([sys.executable, os.path.join('src', 'main.py')])
+print('Starting WhisperWriter...', flush=True)
+main_script = os.path.join('src', 'main.py')
+if os.name == 'nt':
+    # Windows has no real exec: os.execv spawns a child and exits, detaching it from the console (and Ctrl+C).
+    subprocess.run([sys.executable, main_script])
+else:
+    os.execv(sys.executable, [sys.executable, main_script])
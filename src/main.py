@@ -1,18 +1,76 @@
+import copy
+import functools
 import json
 import logging
 import os
 import queue
+import sys
 import threading
 import time
 from typing import Any, Dict, Optional
 
 import keyboard
+import pyperclip
 from audioplayer import AudioPlayer
-from pynput.keyboard import Controller
+from pynput.keyboard import Controller, Key
 
 from status_window import StatusWindow
 from transcription import create_local_model, record_and_transcribe
 
+DEFAULT_CONFIG: Dict[str, Any] = {
+    'use_api': False,
+    'api_options': {
+        'model': 'whisper-1',
+        'language': None,
+        'temperature': 0.0,
+        'initial_prompt': None
+    },
+    'local_model_options': {
+        'model': 'base',
+        'device': 'auto',
+        'compute_type': 'auto',
+        'language': None,
+        'temperature': 0.0,
+        'initial_prompt': None,
+        'condition_on_previous_text': True,
+        'vad_filter': False,
+    },
+    'activation_key': 'ctrl+shift+space',
+    'recording_mode': 'voice_activity_detection',
+    # 'voice_activity_detection', 'press_to_toggle', continuous, or 'hold_to_record'
+    'sound_device': None,
+    'sample_rate': 16000,
+    'silence_duration': 900,
+    'writing_key_press_delay': 0.008,
+    'noise_on_completion': False,
+    'remove_trailing_period': True,
+    'add_trailing_space': False,
+    'remove_capitalization': False,
+    'print_to_terminal': True,
+    'hide_status_window': False
+}
+
+
+def load_config(config_path: str, modified_time: Optional[float]) -> Dict[str, Any]:
+    """
+    Merge the user's config.json over DEFAULT_CONFIG. The merged result is cached on the file's modification time, so
+    the file is only re-read after it changes; callers get their own copy and may modify it freely.
+    """
+    return copy.deepcopy(_load_config(config_path, modified_time))
+
+
+@functools.lru_cache(maxsize=1)
+def _load_config(config_path: str, modified_time: Optional[float]) -> Dict[str, Any]:
+    config: Dict[str, Any] = copy.deepcopy(DEFAULT_CONFIG)
+    if modified_time is not None:
+        with open(config_path, 'r') as config_file:
+            user_config: Dict[str, Any] = json.load(config_file)
+            for key, value in user_config.items():
+                if key in config and value is not None:
+                    config[key] = value
+
+    return config
+
 
 class WhisperWriter:
     def __init__(self) -> None:
@@ -20,6 +78,8 @@ class WhisperWriter:
         self.status_queue: queue.Queue = queue.Queue()
         self.local_model: Optional[Any] = None
         self.pyinput_keyboard: Controller = Controller()
+        self.completion_sound: Optional[AudioPlayer] = (
+            AudioPlayer(os.path.join('assets', 'beep.wav')) if self.config['noise_on_completion'] else None)
         self.logger: logging.Logger = self.setup_logger()
 
         if not self.config['use_api']:
@@ -42,48 +102,9 @@ class WhisperWriter:
             self.stop_transcription = True
 
     def load_config_with_defaults(self) -> Dict[str, Any]:
-        default_config: Dict[str, Any] = {
-            'use_api': False,
-            'api_options': {
-                'model': 'whisper-1',
-                'language': None,
-                'temperature': 0.0,
-                'initial_prompt': None
-            },
-            'local_model_options': {
-                'model': 'base',
-                'device': 'auto',
-                'compute_type': 'auto',
-                'language': None,
-                'temperature': 0.0,
-                'initial_prompt': None,
-                'condition_on_previous_text': True,
-                'vad_filter': False,
-            },
-            'activation_key': 'ctrl+shift+space',
-            'recording_mode': 'voice_activity_detection',
-            # 'voice_activity_detection', 'press_to_toggle', continuous, or 'hold_to_record'
-            'sound_device': None,
-            'sample_rate': 16000,
-            'silence_duration': 900,
-            'writing_key_press_delay': 0.008,
-            'noise_on_completion': False,
-            'remove_trailing_period': True,
-            'add_trailing_space': False,
-            'remove_capitalization': False,
-            'print_to_terminal': True,
-            'hide_status_window': False
-        }
-
         config_path: str = os.path.join('src', 'config.json')
-        if os.path.isfile(config_path):
-            with open(config_path, 'r') as config_file:
-                user_config: Dict[str, Any] = json.load(config_file)
-                for key, value in user_config.items():
-                    if key in default_config and value is not None:
-                        default_config[key] = value
-
-        return default_config
+        modified_time: Optional[float] = os.path.getmtime(config_path) if os.path.isfile(config_path) else None
+        return load_config(config_path, modified_time)
 
     def clear_status_queue(self) -> None:
         while not self.status_queue.empty():
@@ -120,17 +141,34 @@ class WhisperWriter:
         if transcribed_text:
             self.typewrite(transcribed_text, interval=self.config['writing_key_press_delay'])
 
-        if self.config['noise_on_completion']:
-            AudioPlayer(os.path.join('assets', 'beep.wav')).play(block=True)
+        if self.completion_sound:
+            threading.Thread(target=self.completion_sound.play, kwargs={'block': True}, daemon=True).start()
 
     def format_keystrokes(self, key_string: str) -> str:
         return '+'.join(word.capitalize() for word in key_string.split('+'))
 
     def typewrite(self, text: str, interval: float) -> None:
+        if interval <= 0:
+            self.paste(text)
+            return
+
+        deadline: float = time.perf_counter()
         for letter in text:
             self.pyinput_keyboard.press(letter)
             self.pyinput_keyboard.release(letter)
-            time.sleep(interval)
+            deadline += interval
+            remaining: float = deadline - time.perf_counter()
+            if remaining > 0:
+                time.sleep(remaining)
+            else:
+                # Fell behind (e.g. the target app stalled): restart the schedule instead of bursting to catch up.
+                deadline = time.perf_counter()
+
+    def paste(self, text: str) -> None:
+        pyperclip.copy(text)
+        paste_modifier: Key = Key.cmd if sys.platform == 'darwin' else Key.ctrl
+        with self.pyinput_keyboard.pressed(paste_modifier):
+            self.pyinput_keyboard.tap('v')
 
     def setup(self) -> None:
         model_method: str = 'OpenAI\'s API' if self.config['use_api'] else 'a local model'
@@ -159,11 +197,12 @@ class WhisperWriter:
     @staticmethod
     def setup_logger() -> logging.Logger:
         logger: logging.Logger = logging.getLogger(__name__)
-        logger.setLevel(logging.INFO)
-        handler: logging.StreamHandler = logging.StreamHandler()
-        formatter: logging.Formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+        if not logger.handlers:
+            logger.setLevel(logging.INFO)
+            handler: logging.StreamHandler = logging.StreamHandler()
+            formatter: logging.Formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            handler.setFormatter(formatter)
+            logger.addHandler(handler)
         return logger
 
 
@@ -15,11 +15,12 @@ import logging
 
 def setup_logger() -> logging.Logger:
     logger: logging.Logger = logging.getLogger(__name__)
-    logger.setLevel(logging.INFO)
-    handler: logging.StreamHandler = logging.StreamHandler()
-    formatter: logging.Formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    if not logger.handlers:
+        logger.setLevel(logging.INFO)
+        handler: logging.StreamHandler = logging.StreamHandler()
+        formatter: logging.Formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
     return logger
 
 logger = setup_logger()
@@ -114,7 +115,7 @@ def record(status_queue, cancel_flag, config):
                 if len(buffer) < sample_rate * frame_duration // 1000:
                     continue
 
-                frame = buffer[:sample_rate * frame_duration // 1000]
+                frame = np.array(buffer[:sample_rate * frame_duration // 1000], dtype=np.int16)
                 buffer = buffer[sample_rate * frame_duration // 1000:]
                 
                 if not cancel_flag():
@@ -122,16 +123,16 @@ def record(status_queue, cancel_flag, config):
                         if len(recording) > 0 and keyboard.is_pressed(activation_key):
                             break
                         else:
-                            recording.extend(frame)
+                            recording.append(frame)
                     if recording_mode == 'hold_to_record':
                         if keyboard.is_pressed(activation_key):
-                            recording.extend(frame)
+                            recording.append(frame)
                         else:
                             break
                     elif recording_mode == 'voice_activity_detection':
-                        is_speech = vad.is_speech(np.array(frame).tobytes(), sample_rate)
+                        is_speech = vad.is_speech(frame.tobytes(), sample_rate)
                         if is_speech:
-                            recording.extend(frame)
+                            recording.append(frame)
                             num_silent_frames = 0
                         else:
                             if len(recording) > 0:
@@ -143,7 +144,7 @@ def record(status_queue, cancel_flag, config):
             status_queue.put(('cancel', ''))
             return ''
         
-        audio_data = np.array(recording, dtype=np.int16)
+        audio_data = np.concatenate(recording) if recording else np.empty(0, dtype=np.int16)
         logger.info(f'Recording finished. Size: {audio_data.size}' ) if config['print_to_terminal'] else ''
         
         # Save the recorded audio as a temporary WAV file on disk
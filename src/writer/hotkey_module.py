@@ -0,0 +1,103 @@
+from pynput.keyboard import Key, KeyCode, Listener
+
+# `keyboard` key names that are spelled differently in pynput.
+KEY_ALIASES = {
+    'control': 'ctrl',
+    'option': 'alt',
+    'windows': 'cmd',
+    'win': 'cmd',
+    'super': 'cmd',
+    'command': 'cmd',
+    'left ctrl': 'ctrl_l',
+    'right ctrl': 'ctrl_r',
+    'left shift': 'shift_l',
+    'right shift': 'shift_r',
+    'left alt': 'alt_l',
+    'right alt': 'alt_r',
+    'left windows': 'cmd_l',
+    'right windows': 'cmd_r',
+    'return': 'enter',
+    'escape': 'esc',
+    'spacebar': 'space',
+    'del': 'delete',
+    'pgup': 'page_up',
+    'pgdn': 'page_down',
+}
+
+# A generic modifier in the combo is held while either of its sided keys is.
+MODIFIER_SIDES = {
+    Key.ctrl: (Key.ctrl_l, Key.ctrl_r),
+    Key.shift: (Key.shift_l, Key.shift_r),
+    Key.alt: (Key.alt_l, Key.alt_r, Key.alt_gr),
+    Key.cmd: (Key.cmd_l, Key.cmd_r),
+}
+MODIFIERS = set(MODIFIER_SIDES).union(*MODIFIER_SIDES.values())
+
+
+def parse_activation_key(key_string):
+    """
+    Convert a `keyboard`-style combo such as 'ctrl+shift+space' into the pynput keys it is made of. Modifiers stay
+    Key members so sided ones can be told apart; other keys are normalised the way Listener.canonical reports them.
+    """
+    keys = []
+    for name in key_string.lower().split('+'):
+        name = name.strip()
+        if len(name) == 1:
+            keys.append(KeyCode.from_char(name))
+            continue
+        name = KEY_ALIASES.get(name, name).replace(' ', '_')
+        if name not in Key.__members__:
+            raise ValueError(f'Unknown key in activation key combo: {name}')
+        key = Key[name]
+        keys.append(key if key in MODIFIERS or key.value.vk is None else KeyCode.from_vk(key.value.vk))
+    return keys
+
+
+class ActivationKeyListener:
+    """
+    Watches the activation key combo with a single pynput listener. `on_activate` is called from the listener thread
+    each time the whole combo goes down, and `down`/`presses`/`releases` let the recording loop see when the combo is
+    released or pressed again.
+    """
+
+    def __init__(self, key_string, on_activate):
+        self.keys = parse_activation_key(key_string)
+        self.on_activate = on_activate
+        self.down = False
+        self.presses = 0
+        self.releases = 0
+        self.presses_at_release = 0
+        self._pressed = set()
+        self._listener = Listener(on_press=self._on_press, on_release=self._on_release)
+
+    def start(self):
+        self._listener.start()
+
+    def join(self):
+        self._listener.join()
+
+    def _normalize(self, key):
+        return key if key in MODIFIERS else self._listener.canonical(key)
+
+    def _held(self):
+        return all(key in self._pressed or any(side in self._pressed for side in MODIFIER_SIDES.get(key, ()))
+                   for key in self.keys)
+
+    def _on_press(self, key):
+        if key is None:
+            return
+        self._pressed.add(self._normalize(key))
+        # Key repeat keeps firing press events while the combo is held; only count the first one.
+        if not self.down and self._held():
+            self.presses += 1
+            self.down = True
+            self.on_activate()
+
+    def _on_release(self, key):
+        if key is None:
+            return
+        self._pressed.discard(self._normalize(key))
+        if self.down and not self._held():
+            self.presses_at_release = self.presses
+            self.releases += 1
+            self.down = False
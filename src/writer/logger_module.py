@@ -0,0 +1,9 @@
+import logging
+
+LOGGER: logging.Logger = logging.getLogger('whisperwriter')
+
+if not LOGGER.handlers:
+    LOGGER.setLevel(logging.INFO)
+    handler: logging.StreamHandler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    LOGGER.addHandler(handler)
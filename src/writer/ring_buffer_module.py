@@ -0,0 +1,81 @@
+import threading
+import numpy as np
+
+
+def next_power_of_two(value):
+    return 1 << max(value - 1, 0).bit_length()
+
+
+class RingBuffer:
+    """
+    Single-producer/single-consumer circular buffer of audio samples shared between the sounddevice callback and the
+    recording loop. The capacity is rounded up to a power of two so indices wrap with a mask.
+
+    The producer only ever advances the write index and the consumer only ever advances the read index, each with a
+    single assignment once the samples have been copied, so the indices themselves need no lock. When the buffer is
+    full, the incoming samples are dropped and counted in `overruns` rather than overwriting unread data.
+
+    Each write also sets a threading.Event so the consumer can block in `wait` instead of polling. Event.set() briefly
+    takes the event's internal Condition lock, so the producer does take that one lock once per block it writes.
+    """
+
+    def __init__(self, capacity, dtype=np.int16):
+        self.capacity = next_power_of_two(capacity)
+        self.dtype = dtype
+        self.overruns = 0
+        self._mask = self.capacity - 1
+        self._buffer = np.zeros(self.capacity, dtype=dtype)
+        self._read_index = 0
+        self._write_index = 0
+        self._data_available = threading.Event()
+
+    def __len__(self):
+        return self._write_index - self._read_index
+
+    def write(self, data):
+        write_index = self._write_index
+        free = self.capacity - (write_index - self._read_index)
+        count = min(free, len(data))
+        self.overruns += len(data) - count
+        if count == 0:
+            return 0
+
+        start = write_index & self._mask
+        split = min(count, self.capacity - start)
+        np.copyto(self._buffer[start:start + split], data[:split])
+        if split < count:
+            np.copyto(self._buffer[:count - split], data[split:count])
+
+        self._write_index = write_index + count
+        self._data_available.set()
+        return count
+
+    def wait(self, count, timeout=None):
+        while len(self) < count:
+            if not self._data_available.wait(timeout):
+                return False
+            self._data_available.clear()
+        return True
+
+    def read(self, count):
+        read_index = self._read_index
+        if self._write_index - read_index < count:
+            raise ValueError(f'Cannot read {count} samples from a ring buffer holding {len(self)}')
+
+        frame = np.empty(count, dtype=self.dtype)
+        start = read_index & self._mask
+        split = min(count, self.capacity - start)
+        frame[:split] = self._buffer[start:start + split]
+        if split < count:
+            frame[split:] = self._buffer[:count - split]
+
+        self._read_index = read_index + count
+        return frame
+
+    def read_frames(self, frame_length):
+        """
+        Read every whole frame currently buffered with a single copy, returned as a (frames, frame_length) array whose
+        rows are contiguous views.
+        """
+        num_frames = len(self) // frame_length
+        return self.read(num_frames * frame_length).reshape(num_frames, frame_length)
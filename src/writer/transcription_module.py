@@ -1,75 +1,143 @@
+import io
 import traceback
 import numpy as np
 import os
 import sounddevice as sd
-import tempfile
 import wave
 import webrtcvad
 from dotenv import load_dotenv
-from faster_whisper import WhisperModel
+from faster_whisper import BatchedInferencePipeline, WhisperModel
 from openai import OpenAI
-import keyboard
 import torch
-import logging
+from typing import List
 
 from src.configurations.recording_mode import RecordingMode
+from src.writer.logger_module import LOGGER
+from src.writer.ring_buffer_module import RingBuffer
+
+# Frames whose samples all stay below this amplitude are treated as silence without asking the VAD.
+SILENCE_PEAK_AMPLITUDE = 300
 
 
 class TranscriptionService:
     def __init__(self, config):
         self.config = config
         self.local_model = None
-        self.logger = self.setup_logger()
+        self.batched_model = None
+        self.logger = LOGGER
+        self.openai_client = self.create_openai_client() if self.config.use_api else None
+        self.vad = webrtcvad.Vad(3)
+        self.post_process = self.create_post_processor()
+        # Set by the CLI; press_to_toggle and hold_to_record read the combo's state from it.
+        self.activation_key_listener = None
+
+    def create_openai_client(self):
+        load_dotenv()
+        return OpenAI(
+            api_key=os.getenv('OPENAI_API_KEY'),
+            base_url=os.getenv('OPENAI_BASE_URL', 'https://api.openai.com/v1')
+        )
+
+    def resolve_device(self, device):
+        if device == 'auto':
+            return 'cuda' if torch.cuda.is_available() else 'cpu'
+        if device.startswith('cuda') and not torch.cuda.is_available():
+            self.logger.info('CUDA not available, using CPU.')
+            return 'cpu'
+        return device
+
+    def resolve_compute_type(self, device, device_index, compute_type):
+        if compute_type != 'auto':
+            return compute_type
+        if device == 'cuda':
+            capability = torch.cuda.get_device_capability(device_index)
+            if capability >= (7, 5):
+                return 'int8_float16'
+            if capability >= (7, 0):
+                return 'float16'
+            # Older GPUs are left to CTranslate2, which already picks the fastest type they support (e.g. int8 on Pascal).
+            return compute_type
+        return 'int8'
 
-    def setup_logger(self):
-        logger: logging.Logger = logging.getLogger(__name__)
-        logger.setLevel(logging.INFO)
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        return logger
+    def enable_packed_gemm(self):
+        # CTranslate2 reads this when it loads a CPU model; it has no effect on CUDA. An explicit setting wins.
+        os.environ.setdefault('CT2_USE_EXPERIMENTAL_PACKED_GEMM', '1')
 
     def create_local_model(self):
         local_model_options = self.config.local_model_options
-        device = local_model_options.device if torch.cuda.is_available() and local_model_options.device != 'cpu' else 'cpu'
+        device, _, index = self.resolve_device(local_model_options.device).partition(':')
+        device_index = int(index) if index else 0
+        # Use half of the logical cores for intra-op parallelism, leaving the rest for audio capture and the UI.
+        cpu_threads = max(1, (os.cpu_count() or 2) // 2)
+        if device == 'cpu':
+            self.enable_packed_gemm()
         try:
-            model = WhisperModel(local_model_options.model, device=device, compute_type=local_model_options.compute_type)
+            compute_type = self.resolve_compute_type(device, device_index, local_model_options.compute_type)
+            flash_attention = device == 'cuda' and torch.cuda.get_device_capability(device_index) >= (8, 0)
+            self.logger.info(f'Loading {local_model_options.model} on {device}:{device_index} with compute type {compute_type}.')
+            model = WhisperModel(local_model_options.model, device=device, device_index=device_index,
+                                 compute_type=compute_type, cpu_threads=cpu_threads, num_workers=1,
+                                 flash_attention=flash_attention)
         except Exception as e:
+            if device == 'cpu':
+                raise
             self.logger.error(f'Error initializing WhisperModel with CUDA: {e}')
             self.logger.info('Falling back to CPU.')
-            model = WhisperModel(local_model_options.model, device='cpu', compute_type=local_model_options.compute_type)
+            self.enable_packed_gemm()
+            model = WhisperModel(local_model_options.model, device='cpu',
+                                 compute_type=self.resolve_compute_type('cpu', 0, local_model_options.compute_type),
+                                 cpu_threads=cpu_threads, num_workers=1)
         return model
 
-    def transcribe_local(self, temp_audio_file):
+    def encode_wav(self, audio_data):
+        wav_file = io.BytesIO()
+        with wave.open(wav_file, 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(self.config.sample_rate)
+            wf.writeframes(audio_data.tobytes())
+        wav_file.seek(0)
+        return wav_file
+
+    def transcribe_local(self, audio_data):
         if not self.local_model:
             self.local_model = self.create_local_model()
         model_options = self.config.local_model_options
-        response = self.local_model.transcribe(
-            audio=temp_audio_file,
+        options = dict(
             language=model_options.language,
             initial_prompt=model_options.initial_prompt,
             condition_on_previous_text=model_options.condition_on_previous_text,
-            temperature=model_options.temperature,
-            vad_filter=model_options.vad_filter
+            temperature=model_options.temperature
         )
+        # faster-whisper takes float32 arrays at 16 kHz as-is; anything else goes through its decoder to be resampled.
+        if self.config.sample_rate == 16000:
+            audio = audio_data.astype(np.float32) / 32768.0
+        else:
+            audio = self.encode_wav(audio_data)
+        if model_options.batch_size > 1:
+            if not self.batched_model:
+                self.batched_model = BatchedInferencePipeline(self.local_model)
+            # The batched pipeline builds its batches from Silero VAD segments, so the filter must stay on.
+            response = self.batched_model.transcribe(
+                audio, batch_size=model_options.batch_size, vad_filter=True, **options)
+        else:
+            # Voice activity detection mode only keeps speech frames, so a second VAD pass would find nothing to remove.
+            vad_filter = (model_options.vad_filter and
+                          self.config.recording_mode != RecordingMode.VOICE_ACTIVITY_DETECTION)
+            response = self.local_model.transcribe(audio=audio, vad_filter=vad_filter, **options)
         return ''.join([segment.text for segment in list(response[0])])
 
-    def transcribe_api(self, temp_audio_file):
-        load_dotenv()
-        client = OpenAI(
-            api_key=os.getenv('OPENAI_API_KEY'),
-            base_url=os.getenv('OPENAI_BASE_URL', 'https://api.openai.com/v1')
-        )
+    def transcribe_api(self, audio_data):
+        if not self.openai_client:
+            self.openai_client = self.create_openai_client()
         api_options = self.config.api_options
-        with open(temp_audio_file, 'rb') as audio_file:
-            response = client.audio.transcriptions.create(
-                model=api_options.model,
-                file=audio_file,
-                language=api_options.language,
-                prompt=api_options.initial_prompt,
-                temperature=api_options.temperature
-            )
+        response = self.openai_client.audio.transcriptions.create(
+            model=api_options.model,
+            file=('audio.wav', self.encode_wav(audio_data)),
+            language=api_options.language,
+            prompt=api_options.initial_prompt,
+            temperature=api_options.temperature
+        )
         return response.text
 
     def record(self, status_queue, cancel_flag):
@@ -79,96 +147,130 @@ class TranscriptionService:
         buffer_duration = 300
         silence_duration = self.config.silence_duration
 
-        vad = webrtcvad.Vad(3)
-        buffer = []
-        recording = []
+        frame_length = sample_rate * frame_duration // 1000
+
+        vad = self.vad
+        ring_buffer = RingBuffer(sample_rate * buffer_duration // 1000)
+        recording: List[np.ndarray] = []
         num_silent_frames = 0
-        num_buffer_frames = buffer_duration // frame_duration
         num_silence_frames = silence_duration // frame_duration
 
+        # The combo that started the recording is usually still held, so toggling only stops on a press that follows
+        # a release. Until that release is seen, toggle_presses is None.
+        activation_key = self.activation_key_listener
+        releases_at_start = activation_key.releases if activation_key else 0
+        toggle_presses = None
+
+        # Each step consumes one frame and returns True once the recording should stop.
+        def press_to_toggle_step(frame):
+            nonlocal toggle_presses
+            if toggle_presses is None:
+                if not activation_key.down or activation_key.releases != releases_at_start:
+                    toggle_presses = activation_key.presses_at_release
+            elif activation_key.presses != toggle_presses:
+                return True
+            recording.append(frame)
+            return False
+
+        def hold_to_record_step(frame):
+            if not activation_key.down:
+                return True
+            recording.append(frame)
+            return False
+
+        def voice_activity_detection_step(frame):
+            nonlocal num_silent_frames
+            quiet = frame.max() < SILENCE_PEAK_AMPLITUDE and frame.min() > -SILENCE_PEAK_AMPLITUDE
+            if not quiet and vad.is_speech(frame.tobytes(), sample_rate):
+                recording.append(frame)
+                num_silent_frames = 0
+                return False
+            if recording:
+                num_silent_frames += 1
+            return num_silent_frames >= num_silence_frames
+
+        recording_steps = {
+            RecordingMode.PRESS_TO_TOGGLE: press_to_toggle_step,
+            RecordingMode.HOLD_TO_RECORD: hold_to_record_step,
+            RecordingMode.VOICE_ACTIVITY_DETECTION: voice_activity_detection_step,
+        }
+
         try:
+            if self.config.recording_mode not in recording_steps:
+                raise ValueError(f'Unsupported recording mode: {self.config.recording_mode}')
+            if activation_key is None and self.config.recording_mode != RecordingMode.VOICE_ACTIVITY_DETECTION:
+                raise ValueError(f'{self.config.recording_mode.value} needs an activation key listener')
+            step = recording_steps[self.config.recording_mode]
+
             self.logger.info('Recording...')
-            with sd.InputStream(samplerate=sample_rate, channels=1, dtype='int16', blocksize=sample_rate * frame_duration // 1000,
-                                device=sound_device, callback=lambda indata, frames, time, status: buffer.extend(indata[:, 0])):
-                while not cancel_flag():
-                    if len(buffer) < sample_rate * frame_duration // 1000:
+            with sd.InputStream(samplerate=sample_rate, channels=1, dtype='int16', blocksize=frame_length,
+                                device=sound_device, callback=lambda indata, frames, time, status: ring_buffer.write(indata[:, 0])):
+                finished = False
+                while not finished and not cancel_flag():
+                    if not ring_buffer.wait(frame_length, timeout=0.1):
                         continue
 
-                    frame = buffer[:sample_rate * frame_duration // 1000]
-                    buffer = buffer[sample_rate * frame_duration // 1000:]
-
-                    if not cancel_flag():
-                        if self.config.recording_mode == RecordingMode.PRESS_TO_TOGGLE.value:
-                            if len(recording) > 0 and keyboard.is_pressed(self.config.activation_key):
-                                break
-                            else:
-                                recording.extend(frame)
-                        if self.config.recording_mode == RecordingMode.HOLD_TO_RECORD.value:
-                            if keyboard.is_pressed(self.config.activation_key):
-                                recording.extend(frame)
-                            else:
-                                break
-                        elif self.config.recording_mode == RecordingMode.VOICE_ACTIVITY_DETECTION.value:
-                            is_speech = vad.is_speech(np.array(frame).tobytes(), sample_rate)
-                            if is_speech:
-                                recording.extend(frame)
-                                num_silent_frames = 0
-                            else:
-                                if len(recording) > 0:
-                                    num_silent_frames += 1
-                                if num_silent_frames >= num_silence_frames:
-                                    break
+                    for frame in ring_buffer.read_frames(frame_length):
+                        if cancel_flag():
+                            break
+                        if step(frame):
+                            finished = True
+                            break
 
             if cancel_flag():
                 status_queue.put(('cancel', ''))
-                return ''
+                return None
 
-            audio_data = np.array(recording, dtype=np.int16)
-            self.logger.info(f'Recording finished. Size: {audio_data.size}')
-
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_audio_file:
-                with wave.open(temp_audio_file.name, 'wb') as wf:
-                    wf.setnchannels(1)
-                    wf.setsampwidth(2)
-                    wf.setframerate(sample_rate)
-                    wf.writeframes(audio_data.tobytes())
+            if ring_buffer.overruns:
+                self.logger.warning(f'Dropped {ring_buffer.overruns} samples because the recording loop fell behind.')
 
-            return temp_audio_file.name
+            audio_data = np.concatenate(recording) if recording else np.empty(0, dtype=np.int16)
+            self.logger.info(f'Recording finished. Size: {audio_data.size}')
+            return audio_data
 
         except Exception as e:
             traceback.print_exc()
             status_queue.put(('error', 'Error'))
-            return ''
+            return None
+
+    def create_post_processor(self):
+        remove_trailing_period = self.config.remove_trailing_period
+        remove_capitalization = self.config.remove_capitalization
+        trailing_space = ' ' if self.config.add_trailing_space else ''
+
+        def post_process(transcription):
+            transcription = transcription.strip()
+            if remove_trailing_period and transcription.endswith('.'):
+                transcription = transcription[:-1]
+            if remove_capitalization:
+                transcription = transcription.lower()
+            return transcription + trailing_space
+
+        return post_process
 
     def post_process_transcription(self, transcription):
-        transcription = transcription.strip()
-        if self.config.remove_trailing_period and transcription.endswith('.'):
-            transcription = transcription[:-1]
-        if self.config.add_trailing_space:
-            transcription += ' '
-        if self.config.remove_capitalization:
-            transcription = transcription.lower()
+        transcription = self.post_process(transcription)
         self.logger.info(f'Post-processed transcription: {transcription}')
         return transcription
 
-    def transcribe(self, status_queue, cancel_flag, audio_file):
-        if not audio_file:
+    def transcribe(self, status_queue, cancel_flag, audio_data):
+        if audio_data is None or audio_data.size == 0:
             return ''
 
         status_queue.put(('transcribing', 'Transcribing...'))
-        self.logger.info('Transcribing audio file...')
+        self.logger.info('Transcribing audio...')
 
         if self.config.use_api:
-            transcription = self.transcribe_api(audio_file)
+            transcription = self.transcribe_api(audio_data)
         else:
-            transcription = self.transcribe_local(audio_file)
+            transcription = self.transcribe_local(audio_data)
 
         self.logger.info(f'Transcription: {transcription}')
         return self.post_process_transcription(transcription)
 
     def record_and_transcribe(self, status_queue, cancel_flag):
-        audio_file = self.record(status_queue, cancel_flag)
+        audio_data = self.record(status_queue, cancel_flag)
         if cancel_flag():
             return ''
-        result = self.transcribe(status_queue, cancel_flag, audio_file)
+        result = self.transcribe(status_queue, cancel_flag, audio_data)
         return result